@@ -2,20 +2,57 @@
 import json
 import uuid
 from datetime import datetime, timedelta
-from flask import Flask, request, jsonify, render_template
-from typing import List, Dict
+from flask import Flask, Response, request, jsonify, render_template
+from flask.json.provider import DefaultJSONProvider
+from typing import List, Dict, Optional, Set
+from collections import defaultdict, Counter
 import os
-import csv
 import io
-import re
+import threading
+import functools
+import atexit
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # Fall back to stdlib json when the orjson wheel is unavailable
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson."""
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+# Seconds to coalesce mutations before writing data.json
+SAVE_DELAY = 0.2
+
+# Buffer size for reading data.json and the claims CSV
+READ_BUFFER_SIZE = 1 << 20
+
+# Accepted values for validated fields
+_ALLOWED_POLICY_TYPES = frozenset({"Health", "Vehicle", "Life"})
+_ALLOWED_STATUSES = frozenset({"Pending", "Approved", "Rejected"})
 
 # Data Models
 class Policyholder:
     """Represents an insurance policyholder."""
-    def __init__(self, name: str, age: int, policy_type: str, sum_insured: float):
-        self.id = str(uuid.uuid4())
+    __slots__ = ("id", "name", "age", "policy_type", "sum_insured")
+
+    def __init__(self, name: str, age: int, policy_type: str, sum_insured: float, id: Optional[str] = None):
+        self.id = id or str(uuid.uuid4())
         self.name = name
         self.age = age
         self.policy_type = policy_type
@@ -23,13 +60,18 @@ class Policyholder:
 
 class Claim:
     """Represents an insurance claim."""
-    def __init__(self, policyholder_id: str, claim_amount: float, reason: str):
-        self.id = str(uuid.uuid4())
+    __slots__ = ("id", "policyholder_id", "claim_amount", "reason", "status", "date", "date_ts")
+
+    def __init__(self, policyholder_id: str, claim_amount: float, reason: str, id: Optional[str] = None,
+                 date: Optional[datetime] = None):
+        self.id = id or str(uuid.uuid4())
         self.policyholder_id = policyholder_id
         self.claim_amount = claim_amount
         self.reason = reason
         self.status = "Pending"
-        self.date = datetime.now()
+        self.date = date or datetime.now()
+        # POSIX timestamp of date, for cheap float comparisons in reports
+        self.date_ts = self.date.timestamp()
 
 # In-memory storage
 class InsuranceManager:
@@ -37,24 +79,34 @@ class InsuranceManager:
     def __init__(self):
         self.policyholders: Dict[str, Policyholder] = {}
         self.claims: Dict[str, Claim] = {}
+        self._dirty = False
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        # Bumped on every mutation so cached reports know when they are stale
+        self._gen = 0
+        # [mtime_ns, size] of the CSV last merged into data.json, persisted alongside the data
+        self._csv_signature = None
         self.load_data()
         self.load_csv_data()
+        self._rebuild_indexes()
+        atexit.register(self._flush)
 
     def load_data(self):
         """Load policyholders and claims from JSON file."""
         try:
             if os.path.exists("data.json"):
-                with open("data.json", "r") as f:
-                    data = json.load(f)
+                with open("data.json", "rb", buffering=READ_BUFFER_SIZE) as f:
+                    raw = f.read()
+                    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                    self._csv_signature = data.get("csv_signature")
                     for ph_data in data.get("policyholders", []):
-                        ph = Policyholder(ph_data["name"], ph_data["age"], ph_data["policy_type"], ph_data["sum_insured"])
-                        ph.id = ph_data["id"]
+                        ph = Policyholder(ph_data["name"], ph_data["age"], ph_data["policy_type"], ph_data["sum_insured"],
+                                          id=ph_data["id"])
                         self.policyholders[ph.id] = ph
                     for claim_data in data.get("claims", []):
-                        claim = Claim(claim_data["policyholder_id"], claim_data["claim_amount"], claim_data["reason"])
-                        claim.id = claim_data["id"]
+                        claim = Claim(claim_data["policyholder_id"], claim_data["claim_amount"], claim_data["reason"],
+                                      id=claim_data["id"], date=datetime.fromisoformat(claim_data["date"]))
                         claim.status = claim_data["status"]
-                        claim.date = datetime.fromisoformat(claim_data["date"])
                         self.claims[claim.id] = claim
         except (IOError, json.JSONDecodeError) as e:
             print(f"Error loading JSON data: {e}")
@@ -62,33 +114,71 @@ class InsuranceManager:
     def load_csv_data(self):
         """Load claims from Insurance_auto_data.csv."""
         try:
-            with open("Insurance_auto_data.csv", "r") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    customer_id = row["CUSTOMER_ID"]
-                    # Create policyholder if not exists
-                    if customer_id not in self.policyholders:
-                        self.policyholders[customer_id] = Policyholder(
-                            name=f"Customer {customer_id}",
-                            age=30,  # Default age
-                            policy_type="Vehicle",  # Default policy type
-                            sum_insured=float(row["CLAIM_AMOUNT"]) * 2 if row["CLAIM_AMOUNT"] else 100000.0
-                        )
-                    # Add claim
-                    if row["CLAIM_AMOUNT"]:
-                        claim = Claim(
-                            policyholder_id=customer_id,
-                            claim_amount=float(row["CLAIM_AMOUNT"]),
-                            reason=row["REJECTION_REMARKS"] or "Vehicle damage"
-                        )
-                        claim.id = row["CLAIM_ID"]
-                        claim.date = datetime.strptime(row["CLAIM_DATE"], "%Y-%m-%d")
-                        claim.status = "Rejected" if row["REJECTION_REMARKS"] else "Approved" if row["PAID_AMOUNT"] else "Pending"
-                        self.claims[claim.id] = claim
+            stat = os.stat("Insurance_auto_data.csv")
+            signature = [stat.st_mtime_ns, stat.st_size]
+            # data.json already holds everything from this exact CSV
+            if signature == self._csv_signature:
+                return
+            with open("Insurance_auto_data.csv", "r", buffering=READ_BUFFER_SIZE, newline="") as f:
+                df = pd.read_csv(
+                    f,
+                    dtype={"CLAIM_ID": str, "CLAIM_DATE": str, "CUSTOMER_ID": str, "REJECTION_REMARKS": str,
+                           "CLAIM_AMOUNT": float, "PAID_AMOUNT": float},
+                    keep_default_na=False, na_values=[""]
+                )
+            # Parse claim dates up front so a malformed file adds nothing; to_datetime
+            # raises ValueError on a bad date, where read_csv's parse_dates would quietly
+            # leave the column as strings
+            claim_rows = df["CLAIM_AMOUNT"].notna()
+            dates = pd.to_datetime(df.loc[claim_rows, "CLAIM_DATE"], format="ISO8601")
+            if dates.isna().any():
+                raise ValueError("Missing CLAIM_DATE for a claim")
+            # Create policyholders for customers not seen before, sized from their first claim
+            customers = df.drop_duplicates("CUSTOMER_ID")
+            customer_ids = customers["CUSTOMER_ID"].tolist()
+            customers = customers[~customers["CUSTOMER_ID"].isin(self.policyholders.keys())]
+            sum_insured = np.where(customers["CLAIM_AMOUNT"].notna(), customers["CLAIM_AMOUNT"] * 2, 100000.0)
+            for customer_id, amount in zip(customers["CUSTOMER_ID"], sum_insured.tolist()):
+                self.policyholders[customer_id] = Policyholder(
+                    name=f"Customer {customer_id}",
+                    age=30,  # Default age
+                    policy_type="Vehicle",  # Default policy type
+                    sum_insured=amount,
+                    id=customer_id
+                )
+            # Add claims for rows with an amount
+            df = df[claim_rows]
+            status = np.where(df["REJECTION_REMARKS"].notna(), "Rejected",
+                              np.where(df["PAID_AMOUNT"].notna(), "Approved", "Pending"))
+            rows = zip(
+                df["CLAIM_ID"], df["CUSTOMER_ID"], df["CLAIM_AMOUNT"].tolist(),
+                df["REJECTION_REMARKS"].fillna("Vehicle damage"),
+                dates.dt.to_pydatetime().tolist(), status.tolist()
+            )
+            for claim_id, customer_id, amount, reason, date, claim_status in rows:
+                claim = Claim(policyholder_id=customer_id, claim_amount=amount, reason=reason, id=claim_id, date=date)
+                claim.status = claim_status
+                self.claims[claim.id] = claim
+            self._drop_orphaned_csv_customers(set(customer_ids))
+            self._csv_signature = signature
             self.save_data()
         except (IOError, ValueError) as e:
             print(f"Error loading CSV data: {e}")
 
+    def _drop_orphaned_csv_customers(self, customer_ids: Set[str]):
+        """Remove claimless copies of CSV customers stored under another id by older versions."""
+        # Older versions keyed CSV customers by a random uuid, so every boot left one more
+        # "Customer <CUSTOMER_ID>" record with no claims. Names with digits can't come
+        # from add_policyholder, so these records can only be such copies.
+        names = {f"Customer {customer_id}" for customer_id in customer_ids}
+        claimed = {c.policyholder_id for c in self.claims.values()}
+        orphans = [
+            ph_id for ph_id, ph in self.policyholders.items()
+            if ph.name in names and ph_id not in customer_ids and ph_id not in claimed
+        ]
+        for ph_id in orphans:
+            del self.policyholders[ph_id]
+
     def save_data(self):
         """Save policyholders and claims to JSON file."""
         try:
@@ -99,28 +189,106 @@ class InsuranceManager:
                 ],
                 "claims": [
                     {"id": c.id, "policyholder_id": c.policyholder_id, "claim_amount": c.claim_amount, "reason": c.reason, 
-                     "status": c.status, "date": c.date.isoformat()}
+                     "status": c.status, "date": c.date}
                     for c in self.claims.values()
-                ]
+                ],
+                "csv_signature": self._csv_signature
             }
-            with open("data.json", "w") as f:
-                json.dump(data, f, indent=2)
+            if orjson is not None:
+                blob = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            else:
+                blob = json.dumps(data, indent=2, default=datetime.isoformat).encode()
+            # Write the whole document in one call, then swap it in atomically
+            with open("data.json.tmp", "wb") as f:
+                f.write(blob)
+            os.replace("data.json.tmp", "data.json")
         except IOError as e:
             print(f"Error saving data: {e}")
 
+    def _rebuild_indexes(self):
+        """Recompute the secondary indexes and report aggregates from self.claims."""
+        # Kept in step with self.claims on every mutation so reports avoid full scans
+        self.claims_by_ph: Dict[str, List[Claim]] = defaultdict(list)
+        self.pending_claims: Dict[str, Claim] = {}
+        # Insertion position of each claim, used to list pending claims in self.claims order
+        self._claim_position: Dict[str, int] = {}
+        self._type_counts = Counter()
+        self._month_counts = Counter()
+        self._type_sum = defaultdict(float)
+        self._type_approved_count = Counter()
+        # Per-policyholder columns for the high-risk report, keyed by policyholder id
+        self._ph_rejected_count = Counter()
+        self._ph_approved_total = defaultdict(float)
+        self._max_approved: Optional[Claim] = None
+        self._max_approved_stale = False
+        for claim in self.claims.values():
+            self._index_claim(claim)
+
+    def _index_claim(self, claim: Claim):
+        """Add a newly stored claim to the secondary indexes."""
+        self._claim_position[claim.id] = len(self._claim_position)
+        self.claims_by_ph[claim.policyholder_id].append(claim)
+        self._apply_claim_delta(claim, 1)
+
+    def _apply_claim_delta(self, claim: Claim, sign: int):
+        """Add (sign=1) or remove (sign=-1) a claim's contribution to the report aggregates."""
+        date = claim.date
+        self._month_counts[f"{date.year:04d}-{date.month:02d}"] += sign
+        ph = self.policyholders.get(claim.policyholder_id)
+        if ph:
+            self._type_counts[ph.policy_type] += sign
+        if claim.status == "Pending":
+            if sign > 0:
+                self.pending_claims[claim.id] = claim
+            else:
+                self.pending_claims.pop(claim.id, None)
+        elif claim.status == "Rejected":
+            self._ph_rejected_count[claim.policyholder_id] += sign
+        elif claim.status == "Approved":
+            self._ph_approved_total[claim.policyholder_id] += sign * claim.claim_amount
+            if ph:
+                self._type_sum[ph.policy_type] += sign * claim.claim_amount
+                self._type_approved_count[ph.policy_type] += sign
+            if sign < 0:
+                if claim is self._max_approved:
+                    self._max_approved = None
+                    self._max_approved_stale = True
+            elif not self._max_approved_stale and (
+                    self._max_approved is None or claim.claim_amount > self._max_approved.claim_amount):
+                self._max_approved = claim
+
+    def _mark_dirty(self):
+        """Schedule a coalesced save; caller must hold _save_lock."""
+        self._dirty = True
+        self._gen += 1
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(SAVE_DELAY, self._flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush(self):
+        """Write pending changes to disk, if any."""
+        with self._save_lock:
+            self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            self.save_data()
+
     def add_policyholder(self, name: str, age: int, policy_type: str, sum_insured: float) -> str:
         """Add a new policyholder with validation."""
-        if not name or not re.match(r"^[A-Za-z\s]+$", name):
+        if not name or not (name.isascii() and name.replace(" ", "").isalpha()):
             raise ValueError("Invalid name (letters and spaces only)")
         if age < 18 or age > 100:
             raise ValueError("Age must be between 18 and 100")
-        if policy_type not in ["Health", "Vehicle", "Life"]:
+        if policy_type not in _ALLOWED_POLICY_TYPES:
             raise ValueError("Invalid policy type")
         if sum_insured <= 0 or sum_insured > 10000000:
             raise ValueError("Sum insured must be between 1 and 10,000,000")
         policyholder = Policyholder(name, age, policy_type, sum_insured)
-        self.policyholders[policyholder.id] = policyholder
-        self.save_data()
+        with self._save_lock:
+            self.policyholders[policyholder.id] = policyholder
+            self._mark_dirty()
         return policyholder.id
 
     def add_claim(self, policyholder_id: str, claim_amount: float, reason: str) -> str:
@@ -132,78 +300,77 @@ class InsuranceManager:
         if not reason or len(reason) > 500:
             raise ValueError("Reason must be non-empty and less than 500 characters")
         claim = Claim(policyholder_id, claim_amount, reason)
-        self.claims[claim.id] = claim
-        self.save_data()
+        with self._save_lock:
+            self.claims[claim.id] = claim
+            self._index_claim(claim)
+            self._mark_dirty()
         return claim.id
 
     def update_claim_status(self, claim_id: str, status: str):
         """Update claim status with validation."""
         if claim_id not in self.claims:
             raise ValueError("Claim not found")
-        if status not in ["Pending", "Approved", "Rejected"]:
+        if status not in _ALLOWED_STATUSES:
             raise ValueError("Invalid status")
-        if self.claims[claim_id].status == "Approved" and status == "Pending":
+        claim = self.claims[claim_id]
+        if claim.status == "Approved" and status == "Pending":
             raise ValueError("Cannot revert Approved to Pending")
-        self.claims[claim_id].status = status
-        self.save_data()
+        if claim.status == status:
+            return
+        with self._save_lock:
+            self._apply_claim_delta(claim, -1)
+            claim.status = status
+            self._apply_claim_delta(claim, 1)
+            self._mark_dirty()
 
     def get_claim_frequency(self, policyholder_id: str) -> int:
         """Calculate number of claims for a policyholder."""
         if policyholder_id not in self.policyholders:
             raise ValueError("Policyholder not found")
-        return len([c for c in self.claims.values() if c.policyholder_id == policyholder_id])
+        return len(self.claims_by_ph.get(policyholder_id, ()))
 
     def get_high_risk_policyholders(self) -> List[Dict]:
         """Identify high-risk policyholders based on claim frequency and ratio."""
-        one_year_ago = datetime.now() - timedelta(days=365)
+        cutoff_ts = (datetime.now() - timedelta(days=365)).timestamp()
         high_risk = []
         for ph in self.policyholders.values():
-            claims = [c for c in self.claims.values() if c.policyholder_id == ph.id]
-            recent_claims = [c for c in claims if c.date >= one_year_ago]
-            rejected_claims = len([c for c in claims if c.status == "Rejected"])
-            total_claim_amount = sum(c.claim_amount for c in claims if c.status == "Approved")
+            claims = self.claims_by_ph.get(ph.id, ())
+            recent_count = sum(1 for c in claims if c.date_ts >= cutoff_ts)
+            rejected_claims = self._ph_rejected_count[ph.id]
+            total_claim_amount = self._ph_approved_total.get(ph.id, 0)
             claim_ratio = total_claim_amount / ph.sum_insured if ph.sum_insured > 0 else 0
-            if len(recent_claims) > 3 or claim_ratio > 0.8 or rejected_claims > 2:
+            if recent_count > 3 or claim_ratio > 0.8 or rejected_claims > 2:
                 high_risk.append({
-                    "id": ph.id, "name": ph.name, "claim_count": len(recent_claims), 
+                    "id": ph.id, "name": ph.name, "claim_count": recent_count, 
                     "claim_ratio": claim_ratio, "rejected_count": rejected_claims
                 })
         return high_risk
 
     def get_claims_by_policy_type(self) -> Dict[str, int]:
         """Count claims by policy type."""
-        result = {"Health": 0, "Vehicle": 0, "Life": 0}
-        for claim in self.claims.values():
-            ph = self.policyholders.get(claim.policyholder_id)
-            if ph:
-                result[ph.policy_type] += 1
-        return result
+        return {k: self._type_counts[k] for k in ("Health", "Vehicle", "Life")}
 
     def get_monthly_claims(self) -> Dict[str, int]:
         """Count claims by month."""
-        result = {}
-        for claim in self.claims.values():
-            month = claim.date.strftime("%Y-%m")
-            result[month] = result.get(month, 0) + 1
-        return result
+        return {month: count for month, count in self._month_counts.items() if count}
 
     def get_avg_claim_amount_by_policy_type(self) -> Dict[str, float]:
         """Calculate average claim amount by policy type."""
-        sums = {"Health": 0, "Vehicle": 0, "Life": 0}
-        counts = {"Health": 0, "Vehicle": 0, "Life": 0}
-        for claim in self.claims.values():
-            ph = self.policyholders.get(claim.policyholder_id)
-            if ph and claim.status == "Approved":
-                sums[ph.policy_type] += claim.claim_amount
-                counts[ph.policy_type] += 1
-        return {k: sums[k] / counts[k] if counts[k] > 0 else 0 for k in sums}
+        counts = self._type_approved_count
+        return {k: self._type_sum[k] / counts[k] if counts[k] > 0 else 0 for k in ("Health", "Vehicle", "Life")}
 
     def get_highest_claim(self) -> Dict:
         """Get the highest approved claim."""
-        approved_claims = [c for c in self.claims.values() if c.status == "Approved"]
-        if not approved_claims:
+        # Held so a concurrent status change can't slip in between the rescan and the flag reset
+        with self._save_lock:
+            if self._max_approved_stale:
+                # The previous maximum lost its approval; rescan once to find the new one
+                approved_claims = [c for c in self.claims.values() if c.status == "Approved"]
+                self._max_approved = max(approved_claims, key=lambda c: c.claim_amount, default=None)
+                self._max_approved_stale = False
+            max_claim = self._max_approved
+        if max_claim is None:
             return {}
-        max_claim = max(approved_claims, key=lambda c: c.claim_amount)
         ph = self.policyholders.get(max_claim.policyholder_id)
         return {
             "claim_id": max_claim.id, "policyholder_name": ph.name if ph else "Unknown",
@@ -212,10 +379,12 @@ class InsuranceManager:
 
     def get_pending_claims(self) -> List[Dict]:
         """List all pending claims."""
+        with self._save_lock:
+            pending = sorted(self.pending_claims.values(), key=lambda c: self._claim_position[c.id])
         return [
             {"claim_id": c.id, "policyholder_name": self.policyholders[c.policyholder_id].name, 
              "amount": c.claim_amount, "reason": c.reason}
-            for c in self.claims.values() if c.status == "Pending"
+            for c in pending
         ]
 
     def get_policyholder(self, policyholder_id: str) -> Dict:
@@ -242,11 +411,34 @@ class InsuranceManager:
 
 manager = InsuranceManager()
 
+# Serialized report bodies, keyed by endpoint name: (generation, bytes)
+_report_cache = {}
+
+def cached_report(view):
+    """Serve a report's JSON body from cache until the manager's data changes."""
+    @functools.wraps(view)
+    def wrapper():
+        gen = manager._gen
+        cached = _report_cache.get(view.__name__)
+        if cached is not None and cached[0] == gen:
+            return Response(cached[1], mimetype=app.json.mimetype)
+        response = view()
+        _report_cache[view.__name__] = (gen, response.get_data())
+        return response
+    return wrapper
+
 # Web Routes
+_index_html = None
+
 @app.route('/')
 def index():
     """Render the main web interface."""
-    return render_template('index.html')
+    global _index_html
+    # The page has no template variables, so render it once and reuse the bytes
+    # (re-rendered every time in debug mode so template edits show up)
+    if _index_html is None or app.debug:
+        _index_html = render_template('index.html').encode()
+    return Response(_index_html, mimetype='text/html')
 
 # REST API
 @app.route('/api/policyholders', methods=['POST'])
@@ -294,37 +486,43 @@ def update_claim_status_api(claim_id):
     """Update claim status via API."""
     try:
         data = request.json
-        manager.update_claim_status(claim_id, data['陕西省'])
+        manager.update_claim_status(claim_id, data['status'])
         return jsonify({"message": "Status updated"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+# Not cached: the one-year window moves with the clock, not just with the data
 @app.route('/api/reports/high_risk', methods=['GET'])
 def high_risk_report():
     """Get high-risk policyholders report."""
     return jsonify(manager.get_high_risk_policyholders())
 
 @app.route('/api/reports/monthly_claims', methods=['GET'])
+@cached_report
 def monthly_claims_report():
     """Get monthly claims report."""
     return jsonify(manager.get_monthly_claims())
 
 @app.route('/api/reports/avg_claim_amount', methods=['GET'])
+@cached_report
 def avg_claim_amount_report():
     """Get average claim amount by policy type report."""
     return jsonify(manager.get_avg_claim_amount_by_policy_type())
 
 @app.route('/api/reports/highest_claim', methods=['GET'])
+@cached_report
 def highest_claim_report():
     """Get highest claim report."""
     return jsonify(manager.get_highest_claim())
 
 @app.route('/api/reports/pending_claims', methods=['GET'])
+@cached_report
 def pending_claims_report():
     """Get pending claims report."""
     return jsonify(manager.get_pending_claims())
 
 @app.route('/api/reports/claims_by_policy_type', methods=['GET'])
+@cached_report
 def claims_by_policy_type_report():
     """Get claims by policy type report."""
     return jsonify(manager.get_claims_by_policy_type())
@@ -0,0 +1,329 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import app
+
+CSV_PATH = os.path.join(HERE, "..", "performance report", "Insurance_auto_data.csv")
+
+
+def rounded(obj):
+    """Round floats so running sums can be compared with freshly computed ones."""
+    if isinstance(obj, float):
+        return round(obj, 6)
+    if isinstance(obj, dict):
+        return {k: rounded(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [rounded(v) for v in obj]
+    return obj
+
+
+def recompute_reports(manager):
+    """Compute every report with a full scan over manager.claims, without the incremental aggregates."""
+    claims = list(manager.claims.values())
+    policyholders = manager.policyholders
+    by_type = {"Health": 0, "Vehicle": 0, "Life": 0}
+    sums = {"Health": 0, "Vehicle": 0, "Life": 0}
+    counts = {"Health": 0, "Vehicle": 0, "Life": 0}
+    monthly = {}
+    for c in claims:
+        ph = policyholders.get(c.policyholder_id)
+        if ph:
+            by_type[ph.policy_type] += 1
+            if c.status == "Approved":
+                sums[ph.policy_type] += c.claim_amount
+                counts[ph.policy_type] += 1
+        month = c.date.strftime("%Y-%m")
+        monthly[month] = monthly.get(month, 0) + 1
+
+    approved = [c for c in claims if c.status == "Approved"]
+    highest = {}
+    if approved:
+        top = max(approved, key=lambda c: c.claim_amount)
+        ph = policyholders.get(top.policyholder_id)
+        highest = {
+            "claim_id": top.id, "policyholder_name": ph.name if ph else "Unknown",
+            "amount": top.claim_amount, "reason": top.reason
+        }
+
+    one_year_ago = datetime.now() - timedelta(days=365)
+    high_risk = []
+    for ph in policyholders.values():
+        ph_claims = [c for c in claims if c.policyholder_id == ph.id]
+        recent = len([c for c in ph_claims if c.date >= one_year_ago])
+        rejected = len([c for c in ph_claims if c.status == "Rejected"])
+        total = sum(c.claim_amount for c in ph_claims if c.status == "Approved")
+        ratio = total / ph.sum_insured if ph.sum_insured > 0 else 0
+        if recent > 3 or ratio > 0.8 or rejected > 2:
+            high_risk.append({
+                "id": ph.id, "name": ph.name, "claim_count": recent,
+                "claim_ratio": ratio, "rejected_count": rejected
+            })
+
+    return {
+        "claims_by_policy_type": by_type,
+        "monthly_claims": monthly,
+        "avg_claim_amount": {k: sums[k] / counts[k] if counts[k] > 0 else 0 for k in sums},
+        "highest_claim": highest,
+        "pending_claims": [
+            {"claim_id": c.id, "policyholder_name": policyholders[c.policyholder_id].name,
+             "amount": c.claim_amount, "reason": c.reason}
+            for c in claims if c.status == "Pending"
+        ],
+        "high_risk": high_risk,
+    }
+
+
+def current_reports(manager):
+    return {
+        "claims_by_policy_type": manager.get_claims_by_policy_type(),
+        "monthly_claims": manager.get_monthly_claims(),
+        "avg_claim_amount": manager.get_avg_claim_amount_by_policy_type(),
+        "highest_claim": manager.get_highest_claim(),
+        "pending_claims": manager.get_pending_claims(),
+        "high_risk": manager.get_high_risk_policyholders(),
+    }
+
+
+class ManagerTestCase(unittest.TestCase):
+    """Runs each test in a scratch directory holding a copy of the claims CSV."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.mkdtemp()
+        shutil.copy(CSV_PATH, self.tmpdir)
+        os.chdir(self.tmpdir)
+        # Keep the debounce timer from writing after the test has left the directory
+        patcher = mock.patch.object(app, "SAVE_DELAY", 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            if manager._save_timer is not None:
+                manager._save_timer.cancel()
+            manager._flush()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmpdir)
+
+    def new_manager(self):
+        manager = app.InsuranceManager()
+        self.managers.append(manager)
+        return manager
+
+    def assertReportsConsistent(self, manager):
+        self.assertEqual(rounded(current_reports(manager)), rounded(recompute_reports(manager)))
+
+
+class IncrementalAggregateTests(ManagerTestCase):
+
+    def test_reports_after_load(self):
+        manager = self.new_manager()
+        self.assertTrue(manager.claims)
+        self.assertReportsConsistent(manager)
+
+    def test_reports_follow_claim_lifecycle(self):
+        manager = self.new_manager()
+        health = manager.add_policyholder("Jane Roe", 40, "Health", 10000)
+        life = manager.add_policyholder("John Doe", 55, "Life", 500000)
+        claim_ids = [manager.add_claim(health, 1000 + i, "Checkup") for i in range(5)]
+        claim_ids.append(manager.add_claim(life, 400000, "Accident"))
+        self.assertReportsConsistent(manager)
+
+        for claim_id in claim_ids[:3]:
+            manager.update_claim_status(claim_id, "Approved")
+            self.assertReportsConsistent(manager)
+        manager.update_claim_status(claim_ids[3], "Rejected")
+        self.assertReportsConsistent(manager)
+        # Rejected claims may be reopened
+        manager.update_claim_status(claim_ids[3], "Pending")
+        self.assertReportsConsistent(manager)
+        manager.update_claim_status(claim_ids[5], "Approved")
+        self.assertReportsConsistent(manager)
+
+        # Approved claims can't go back to Pending, and a failed update changes nothing
+        with self.assertRaises(ValueError):
+            manager.update_claim_status(claim_ids[0], "Pending")
+        self.assertReportsConsistent(manager)
+
+    def test_highest_claim_after_max_is_rejected(self):
+        manager = self.new_manager()
+        top = manager.get_highest_claim()
+        manager.update_claim_status(top["claim_id"], "Rejected")
+        self.assertNotEqual(manager.get_highest_claim()["claim_id"], top["claim_id"])
+        self.assertReportsConsistent(manager)
+
+        for claim in list(manager.claims.values()):
+            if claim.status == "Approved":
+                manager.update_claim_status(claim.id, "Rejected")
+        self.assertEqual(manager.get_highest_claim(), {})
+        self.assertReportsConsistent(manager)
+
+    def test_reload_rebuilds_same_reports(self):
+        manager = self.new_manager()
+        ph = manager.add_policyholder("Jane Roe", 40, "Life", 10000)
+        manager.update_claim_status(manager.add_claim(ph, 9000, "Accident"), "Approved")
+        manager._flush()
+        reloaded = self.new_manager()
+        self.assertEqual(rounded(current_reports(reloaded)), rounded(current_reports(manager)))
+        self.assertReportsConsistent(reloaded)
+
+
+class ReportCacheTests(ManagerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(app, "manager", self.new_manager())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app._report_cache.clear()
+        self.client = app.app.test_client()
+
+    def test_report_cached_until_mutation(self):
+        first = self.client.get('/api/reports/claims_by_policy_type').get_json()
+        self.assertIn("claims_by_policy_type_report", app._report_cache)
+        self.assertEqual(self.client.get('/api/reports/claims_by_policy_type').get_json(), first)
+        ph = app.manager.add_policyholder("Jane Roe", 40, "Health", 10000)
+        app.manager.add_claim(ph, 500, "Checkup")
+        self.assertEqual(self.client.get('/api/reports/claims_by_policy_type').get_json()["Health"], first["Health"] + 1)
+
+    def test_high_risk_report_not_cached(self):
+        self.client.get('/api/reports/high_risk')
+        self.assertNotIn("high_risk_report", app._report_cache)
+
+
+class ClaimStatusApiTests(ManagerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(app, "manager", self.new_manager())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app.app.test_client()
+
+    def test_update_claim_status(self):
+        claim_id = app.manager.get_pending_claims()[0]["claim_id"]
+        response = self.client.put(f'/api/claims/{claim_id}/status', json={"status": "Approved"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(app.manager.claims[claim_id].status, "Approved")
+        self.assertEqual(self.client.get(f'/api/claims/{claim_id}').get_json()["status"], "Approved")
+
+    def test_update_claim_status_rejects_invalid_status(self):
+        claim_id = app.manager.get_pending_claims()[0]["claim_id"]
+        response = self.client.put(f'/api/claims/{claim_id}/status', json={"status": "Closed"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(app.manager.claims[claim_id].status, "Pending")
+
+
+@unittest.skipIf(app.orjson is None, "orjson not installed")
+class OrjsonProviderTests(unittest.TestCase):
+
+    def test_sort_keys_follows_provider_and_kwargs(self):
+        provider = app.OrjsonProvider(app.app)
+        data = {"b": 1, "a": 2}
+        self.assertEqual(provider.dumps(data), '{"a":2,"b":1}')
+        self.assertEqual(provider.dumps(data, sort_keys=False), '{"b":1,"a":2}')
+        provider.sort_keys = False
+        self.assertEqual(provider.dumps(data), '{"b":1,"a":2}')
+        self.assertEqual(provider.dumps(data, sort_keys=True), '{"a":2,"b":1}')
+
+
+def write_baseline_data_json():
+    """Write data.json the way the pre-index code did: CSV customers under random uuids, no CSV signature."""
+    policyholders, claims = {}, []
+    with open("Insurance_auto_data.csv", newline="") as f:
+        for row in csv.DictReader(f):
+            customer_id = row["CUSTOMER_ID"]
+            if customer_id not in policyholders:
+                policyholders[customer_id] = {
+                    "id": str(uuid.uuid4()), "name": f"Customer {customer_id}", "age": 30,
+                    "policy_type": "Vehicle",
+                    "sum_insured": float(row["CLAIM_AMOUNT"]) * 2 if row["CLAIM_AMOUNT"] else 100000.0
+                }
+            if row["CLAIM_AMOUNT"]:
+                claims.append({
+                    "id": row["CLAIM_ID"], "policyholder_id": customer_id,
+                    "claim_amount": float(row["CLAIM_AMOUNT"]),
+                    "reason": row["REJECTION_REMARKS"] or "Vehicle damage",
+                    "status": "Rejected" if row["REJECTION_REMARKS"] else "Approved" if row["PAID_AMOUNT"] else "Pending",
+                    "date": datetime.strptime(row["CLAIM_DATE"], "%Y-%m-%d").isoformat()
+                })
+    with open("data.json", "w") as f:
+        json.dump({"policyholders": list(policyholders.values()), "claims": claims}, f, indent=2)
+
+
+class CsvIngestTests(ManagerTestCase):
+
+    def test_boot_on_baseline_data_json(self):
+        write_baseline_data_json()
+        # The old code rewrote data.json on every boot, so it is always newer than the CSV
+        later = os.path.getmtime("Insurance_auto_data.csv") + 60
+        os.utime("data.json", (later, later))
+        manager = self.new_manager()
+        pending = manager.get_pending_claims()
+        self.assertTrue(pending)
+        self.assertEqual(manager.get_claims_by_policy_type()["Vehicle"], len(manager.claims))
+        self.assertTrue(manager.get_highest_claim()["policyholder_name"].startswith("Customer CUST"))
+        self.assertNotEqual(manager.get_avg_claim_amount_by_policy_type()["Vehicle"], 0)
+        for claim in manager.claims.values():
+            self.assertIn(claim.policyholder_id, manager.policyholders)
+        self.assertReportsConsistent(manager)
+
+        # The old uuid-keyed copies are dropped: one record per CSV customer, all keyed by CUSTOMER_ID
+        with open("Insurance_auto_data.csv", newline="") as f:
+            customer_ids = {row["CUSTOMER_ID"] for row in csv.DictReader(f)}
+        self.assertEqual(set(manager.policyholders), customer_ids)
+        manager._flush()
+        self.assertEqual(set(self.new_manager().policyholders), customer_ids)
+
+    def test_api_policyholders_survive_reingest(self):
+        manager = self.new_manager()
+        ph = manager.add_policyholder("Jane Roe", 40, "Health", 10000)
+        manager._flush()
+        later = time.time() + 60
+        os.utime("Insurance_auto_data.csv", (later, later))
+        self.assertIn(ph, self.new_manager().policyholders)
+
+    def test_malformed_claim_date_is_reported(self):
+        header = "CLAIM_ID,CLAIM_DATE,CUSTOMER_ID,CLAIM_AMOUNT,PREMIUM_COLLECTED,PAID_AMOUNT,CITY,REJECTION_REMARKS\n"
+        for bad_date in ("not-a-date", ""):
+            with open("Insurance_auto_data.csv", "w") as f:
+                f.write(header)
+                f.write("C1,2025-04-01,CUST1,100.0,10.0,50.0,PUNE,\n")
+                f.write(f"C2,{bad_date},CUST2,200.0,20.0,,PUNE,\n")
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                manager = self.new_manager()
+            self.assertIn("Error loading CSV data", output.getvalue())
+            self.assertEqual(manager.claims, {})
+            self.assertEqual(manager.policyholders, {})
+
+    def test_unchanged_csv_is_not_reingested(self):
+        manager = self.new_manager()
+        claim_id = manager.get_pending_claims()[0]["claim_id"]
+        manager.update_claim_status(claim_id, "Approved")
+        manager._flush()
+        self.assertEqual(self.new_manager().claims[claim_id].status, "Approved")
+
+        # A modified CSV is merged again and its statuses win
+        later = time.time() + 60
+        os.utime("Insurance_auto_data.csv", (later, later))
+        self.assertEqual(self.new_manager().claims[claim_id].status, "Pending")
+
+
+if __name__ == '__main__':
+    unittest.main()
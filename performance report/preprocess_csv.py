@@ -1,66 +1,71 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+# Fields parsed as non-negative numbers
+NUMERIC_FIELDS = ['CLAIM_AMOUNT', 'PREMIUM_COLLECTED', 'PAID_AMOUNT']
+
+# Fields that must be present for a row to be kept
+REQUIRED_FIELDS = ['CLAIM_ID', 'CUSTOMER_ID']
+
 # Defining function to preprocess CSV data
 def preprocess_csv(csv_content):
-    # Splitting content into lines
-    lines = csv_content.strip().split('\n')
-    if not lines:
+    if not csv_content.strip():
         return []
-    
-    # Extracting headers
-    headers = [h.strip().replace('"', '') for h in lines[0].split(',')]
-    
-    # Initializing result list
-    cleaned_data = []
-    
-    # Processing each data row
-    for line in lines[1:]:
-        values = line.split(',')
-        if len(values) != len(headers):
-            continue  # Skip malformed rows
-        
-        row = {}
-        valid_row = True
-        
-        # Processing each field
-        for header, value in zip(headers, values):
-            value = value.strip().replace('"', '')
-            
-            # Handling numerical fields
-            if header in ['CLAIM_AMOUNT', 'PREMIUM_COLLECTED', 'PAID_AMOUNT']:
+
+    # Reading every field as text with the header as a plain row, so the header
+    # fixes the width: longer rows are skipped wherever they appear (instead of
+    # pandas turning an extra leading column into the index), shorter rows are
+    # padded with empty strings
+    raw = pd.read_csv(io.StringIO(csv_content.strip()), header=None, dtype=str,
+                      keep_default_na=False, on_bad_lines='skip')
+
+    # Cleaning headers and values
+    df = raw.iloc[1:].reset_index(drop=True)
+    df.columns = [h.strip().replace('"', '') for h in raw.iloc[0]]
+    for column in df.columns:
+        df[column] = df[column].str.strip().str.replace('"', '', regex=False)
+
+    valid = pd.Series(True, index=df.index)
+
+    # Handling numerical fields: empty means 0.0, unparsable or negative drops the row
+    for column in NUMERIC_FIELDS:
+        if column in df.columns:
+            text = df[column].mask(df[column] == '', '0')
+            values = pd.to_numeric(text, errors='coerce').astype(float)
+            unparsable = pd.Series(False, index=df.index)
+            # Retrying the few cells to_numeric rejects with float(), which also
+            # accepts spellings such as 'nan' or '1_000'
+            for index, value in text[values.isna()].items():
                 try:
-                    row[header] = float(value) if value else 0.0
-                    if row[header] < 0:
-                        valid_row = False
+                    values[index] = float(value)
                 except ValueError:
-                    row[header] = 0.0
-                    valid_row = False
-            
-            # Handling date
-            elif header == 'CLAIM_DATE':
-                row[header] = value if value else ''
-            
-            # Handling other fields
-            else:
-                row[header] = value if value else ''
-                
-                # Validating required fields
-                if header in ['CLAIM_ID', 'CUSTOMER_ID'] and not value:
-                    valid_row = False
-        
-        # Adding valid row to result
-        if valid_row:
-            # Classifying rejection remarks
-            remark = row.get('REJECTION_REMARKS', '')
-            if not remark:
-                row['REJECTION_CLASS'] = 'NoRemark'
-            elif 'policy_expired' in remark.lower():
-                row['REJECTION_CLASS'] = 'Policy_expired'
-            elif 'fake_document' in remark.lower():
-                row['REJECTION_CLASS'] = 'Fake_document'
-            elif 'not_covered' in remark.lower():
-                row['REJECTION_CLASS'] = 'Not_Covered'
-            else:
-                row['REJECTION_CLASS'] = 'Other'
-            
-            cleaned_data.append(row)
-    
-    return cleaned_data
\ No newline at end of file
+                    unparsable[index] = True
+            valid &= ~unparsable & ~(values < 0)
+            df[column] = values.mask(unparsable, 0.0)
+
+    # Validating required fields
+    for column in REQUIRED_FIELDS:
+        if column in df.columns:
+            valid &= df[column] != ''
+
+    df = df[valid]
+
+    # Classifying rejection remarks
+    if 'REJECTION_REMARKS' in df.columns:
+        remarks = df['REJECTION_REMARKS']
+    else:
+        remarks = pd.Series('', index=df.index)
+    df['REJECTION_CLASS'] = np.select(
+        [
+            remarks == '',
+            remarks.str.contains('policy_expired', case=False, regex=False),
+            remarks.str.contains('fake_document', case=False, regex=False),
+            remarks.str.contains('not_covered', case=False, regex=False),
+        ],
+        ['NoRemark', 'Policy_expired', 'Fake_document', 'Not_Covered'],
+        default='Other'
+    )
+
+    return df.to_dict(orient='records')
\ No newline at end of file
@@ -5,6 +5,9 @@ REJECTION_REASONS_MAP = {
     "policy_expired": "Policy_expired"
 }
 
+# Lowercased needles, in lookup order, so each text is only lowercased once
+REJECTION_REASONS_LOWER = tuple((reason.lower(), rejection_class) for reason, rejection_class in REJECTION_REASONS_MAP.items())
+
 # Function to handle errors
 def handle_error(error_message):
     print(f"Error: {error_message}")
@@ -20,15 +23,19 @@ def contains_rejection_reason(rejection_text, reason):
         handle_error(f"Error in contains_rejection_reason: {str(e)}")
         return False
 
+# Function to find the first rejection reason in already-lowercased text
+def match_rejection_reason(lowered_text):
+    for reason, rejection_class in REJECTION_REASONS_LOWER:
+        if reason in lowered_text:
+            return rejection_class
+    return "Unknown"
+
 # Function to map rejection text to a class
 def map_rejection_reason(rejection_text):
     try:
         if not rejection_text or not isinstance(rejection_text, str):
             return "NoRemark"
-        for reason, rejection_class in REJECTION_REASONS_MAP.items():
-            if contains_rejection_reason(rejection_text, reason):
-                return rejection_class
-        return "Unknown"
+        return match_rejection_reason(rejection_text.lower())
     except Exception as e:
         handle_error(f"Error in map_rejection_reason: {str(e)}")
         return "Error"
@@ -42,10 +49,7 @@ def complex_rejection_classifier(remark_text):
             return "NoRemark"
         
         # Check for each rejection reason
-        for reason, rejection_class in REJECTION_REASONS_MAP.items():
-            if contains_rejection_reason(remark_text, reason):
-                return rejection_class
-        return "Unknown"
+        return match_rejection_reason(remark_text.lower())
     except Exception as e:
         handle_error(f"Error in complex_rejection_classifier: {str(e)}")
         return "Error"
\ No newline at end of file
@@ -0,0 +1,134 @@
+import math
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from preprocess_csv import preprocess_csv
+
+HEADER = "CLAIM_ID,CLAIM_DATE,CUSTOMER_ID,CLAIM_AMOUNT,PREMIUM_COLLECTED,PAID_AMOUNT,CITY,REJECTION_REMARKS"
+
+
+def legacy_preprocess_csv(csv_content):
+    """The line-splitting implementation preprocess_csv replaced, kept as a reference."""
+    lines = csv_content.strip().split('\n')
+    if not lines:
+        return []
+    headers = [h.strip().replace('"', '') for h in lines[0].split(',')]
+    cleaned_data = []
+    for line in lines[1:]:
+        values = line.split(',')
+        if len(values) != len(headers):
+            continue
+        row = {}
+        valid_row = True
+        for header, value in zip(headers, values):
+            value = value.strip().replace('"', '')
+            if header in ['CLAIM_AMOUNT', 'PREMIUM_COLLECTED', 'PAID_AMOUNT']:
+                try:
+                    row[header] = float(value) if value else 0.0
+                    if row[header] < 0:
+                        valid_row = False
+                except ValueError:
+                    row[header] = 0.0
+                    valid_row = False
+            else:
+                row[header] = value if value else ''
+                if header in ['CLAIM_ID', 'CUSTOMER_ID'] and not value:
+                    valid_row = False
+        if valid_row:
+            remark = row.get('REJECTION_REMARKS', '')
+            if not remark:
+                row['REJECTION_CLASS'] = 'NoRemark'
+            elif 'policy_expired' in remark.lower():
+                row['REJECTION_CLASS'] = 'Policy_expired'
+            elif 'fake_document' in remark.lower():
+                row['REJECTION_CLASS'] = 'Fake_document'
+            elif 'not_covered' in remark.lower():
+                row['REJECTION_CLASS'] = 'Not_Covered'
+            else:
+                row['REJECTION_CLASS'] = 'Other'
+            cleaned_data.append(row)
+    return cleaned_data
+
+
+def comparable(rows):
+    """Replace NaN, which never compares equal, with a marker and check value types too."""
+    return [
+        {k: ('NaN' if isinstance(v, float) and math.isnan(v) else (type(v).__name__, v)) for k, v in row.items()}
+        for row in rows
+    ]
+
+
+def csv_text(*rows):
+    return "\n".join((HEADER,) + rows) + "\n"
+
+
+class PreprocessCsvTests(unittest.TestCase):
+
+    def assertSameAsLegacy(self, content):
+        self.assertEqual(comparable(preprocess_csv(content)), comparable(legacy_preprocess_csv(content)))
+
+    def test_sample_data_matches_legacy(self):
+        with open(os.path.join(HERE, "Insurance_auto_data.csv")) as f:
+            self.assertSameAsLegacy(f.read())
+
+    def test_empty_input(self):
+        self.assertEqual(preprocess_csv(""), [])
+        self.assertEqual(preprocess_csv(HEADER + "\n"), [])
+
+    def test_long_first_row_is_skipped(self):
+        content = csv_text(
+            "C1,2025-04-01,CUST1,100,10,50,PUNE,,extra",
+            "C2,2025-04-02,CUST2,200,20,,PUNE,Policy_Expired",
+        )
+        self.assertSameAsLegacy(content)
+        self.assertEqual([row["CLAIM_ID"] for row in preprocess_csv(content)], ["C2"])
+
+    def test_long_middle_row_is_skipped(self):
+        self.assertSameAsLegacy(csv_text(
+            "C1,2025-04-01,CUST1,100,10,50,PUNE,",
+            "C2,2025-04-02,CUST2,200,20,,PUNE,Fake_document,extra",
+            "C3,2025-04-03,CUST3,300,30,,PUNE,not_covered",
+        ))
+
+    def test_invalid_values_match_legacy(self):
+        self.assertSameAsLegacy(csv_text(
+            "C1,2025-04-01,CUST1,nan,10,50,PUNE,",
+            "C2,2025-04-01,CUST2,-5,10,50,PUNE,",
+            "C3,2025-04-01,CUST3,abc,10,50,PUNE,",
+            "C4,2025-04-01,,5,10,50,PUNE,",
+            ",2025-04-01,CUST5,5,10,50,PUNE,",
+            "C6,2025-04-01,CUST6,5,,,PUNE,something else",
+            "C7,2025-04-01,CUST7,1_000,10,5,PUNE,",
+            'C8,"2025-04-01",CUST8,"7",10,5,"PUNE",',
+        ))
+
+    def test_integral_amounts_are_floats(self):
+        rows = preprocess_csv(csv_text("C1,2025-04-01,CUST1,5,10,,PUNE,"))
+        self.assertEqual(comparable(rows)[0]["CLAIM_AMOUNT"], ("float", 5.0))
+        self.assertEqual(comparable(rows)[0]["PAID_AMOUNT"], ("float", 0.0))
+
+    def test_short_row_is_padded(self):
+        # The legacy splitter dropped short rows; the CSV reader pads them like csv.DictReader
+        content = csv_text("C1,2025-04-01,CUST1,5,10")
+        self.assertEqual(legacy_preprocess_csv(content), [])
+        self.assertEqual(preprocess_csv(content), [{
+            "CLAIM_ID": "C1", "CLAIM_DATE": "2025-04-01", "CUSTOMER_ID": "CUST1", "CLAIM_AMOUNT": 5.0,
+            "PREMIUM_COLLECTED": 10.0, "PAID_AMOUNT": 0.0, "CITY": "", "REJECTION_REMARKS": "",
+            "REJECTION_CLASS": "NoRemark",
+        }])
+
+    def test_quoted_comma_stays_in_field(self):
+        # The legacy splitter broke quoted fields apart and then dropped the row
+        content = csv_text('C1,2025-04-01,CUST1,5,10,5,PUNE,"Policy_expired, no renewal"')
+        self.assertEqual(legacy_preprocess_csv(content), [])
+        rows = preprocess_csv(content)
+        self.assertEqual(rows[0]["REJECTION_REMARKS"], "Policy_expired, no renewal")
+        self.assertEqual(rows[0]["REJECTION_CLASS"], "Policy_expired")
+
+
+if __name__ == '__main__':
+    unittest.main()